@@ -7,6 +7,7 @@ from flask_socketio import SocketIO, emit
 from servo_controller import ServoController
 from config import Config
 import json
+import threading
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = Config.SECRET_KEY
@@ -14,6 +15,46 @@ socketio = SocketIO(app, cors_allowed_origins="*")
 
 # Initialize servo controller
 servo_controller = ServoController()
+servo_controller.motion_listener = lambda event, data: socketio.emit(event, data)
+try:
+    servo_controller.apply_motion_profiles()
+except Exception as e:
+    print(f"Could not apply motion profiles: {e}")
+
+# Motion monitor state (one background task polls while any servo is moving)
+motion_monitor_running = False
+motion_monitor_lock = threading.Lock()
+
+def monitor_motion():
+    """Poll in-flight moves until every servo has arrived (events go out via the motion listener)"""
+    global motion_monitor_running
+    failures = 0
+    while True:
+        socketio.sleep(Config.MOTION_POLL_INTERVAL)
+        try:
+            servo_controller.poll_motion()
+            failures = 0
+        except Exception as e:
+            failures += 1
+            if failures >= Config.MOTION_POLL_RETRIES:
+                # Without feedback the moves can never complete, so report them as failed
+                servo_controller.fail_moves(str(e))
+                socketio.emit('error', {'message': str(e)})
+                failures = 0
+        
+        # Checked under the lock so a move started right now is never missed
+        with motion_monitor_lock:
+            if not servo_controller.is_moving():
+                motion_monitor_running = False
+                return
+
+def ensure_motion_monitor():
+    """Start the motion monitor if any servo is moving and it isn't already running"""
+    global motion_monitor_running
+    with motion_monitor_lock:
+        if servo_controller.is_moving() and not motion_monitor_running:
+            motion_monitor_running = True
+            socketio.start_background_task(monitor_motion)
 
 @app.route('/')
 def index():
@@ -42,8 +83,8 @@ def set_servo_position(servo_id):
     """Set servo to specific position"""
     try:
         data = request.get_json()
-        position = int(data['position'])
-        servo_controller.set_servo_position(servo_id, position)
+        move = servo_controller.set_servo_position(servo_id, int(data['position']))
+        position = move['target']  # Clamped to the safety limits
         
         # Broadcast update to all connected clients
         socketio.emit('servo_update', {
@@ -54,6 +95,8 @@ def set_servo_position(servo_id):
         return jsonify({'success': True, 'position': position})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 400
+    finally:
+        ensure_motion_monitor()
 
 @app.route('/api/servo/<int:servo_id>/nudge', methods=['POST'])
 def nudge_servo(servo_id):
@@ -72,6 +115,34 @@ def nudge_servo(servo_id):
         return jsonify({'success': True, 'position': new_position})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 400
+    finally:
+        ensure_motion_monitor()
+
+@app.route('/api/servo/<int:servo_id>/motion', methods=['POST'])
+def set_servo_motion(servo_id):
+    """Set servo speed and/or acceleration limits"""
+    try:
+        data = request.get_json(silent=True) or {}
+        if 'speed' not in data and 'acceleration' not in data:
+            raise ValueError("Request must include 'speed' and/or 'acceleration'")
+        for key in ('speed', 'acceleration'):
+            if key in data and data[key] is None:
+                raise ValueError(f"'{key}' must be a number")
+        speed = int(data['speed']) if 'speed' in data else None
+        acceleration = int(data['acceleration']) if 'acceleration' in data else None
+        servo_controller.set_motion_profile(servo_id, speed=speed, acceleration=acceleration)
+        
+        # Broadcast new limits to all connected clients
+        profile = {
+            'servo_id': servo_id,
+            'speed': servo_controller.speeds.get(servo_id),
+            'acceleration': servo_controller.accelerations.get(servo_id)
+        }
+        socketio.emit('motion_profile_update', profile)
+        
+        return jsonify({'success': True, 'speed': profile['speed'], 'acceleration': profile['acceleration']})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
 
 @app.route('/api/all-off', methods=['POST'])
 def all_off():
@@ -85,6 +156,8 @@ def all_off():
         return jsonify({'success': True})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
+    finally:
+        ensure_motion_monitor()
 
 @app.route('/api/scenes')
 def get_scenes():
@@ -115,7 +188,9 @@ def get_config():
             'max_scenes': Config.MAX_SCENES,
             'visual_display_style': Config.VISUAL_DISPLAY_STYLE,
             'gate_dimensions': Config.GATE_DIMENSIONS,
-            'show_raw_values': Config.SHOW_RAW_VALUES
+            'show_raw_values': Config.SHOW_RAW_VALUES,
+            'servo_speeds': servo_controller.speeds,
+            'servo_accelerations': servo_controller.accelerations
         }
         return jsonify({'success': True, 'config': config_data})
     except Exception as e:
@@ -150,6 +225,8 @@ def recall_scene(scene_id):
         return jsonify({'success': True, 'positions': positions})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 400
+    finally:
+        ensure_motion_monitor()
 
 @socketio.on('connect')
 def handle_connect():
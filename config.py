@@ -41,6 +41,36 @@ class Config:
         7: {"width": 1, "height": 5}
     }
 
+    # Motion Profiles (Maestro units, 0 = unlimited, None = keep the Maestro's saved setting)
+    # Speed is in 0.25 μs per 10 ms, acceleration in 0.25 μs per 10 ms per 80 ms
+    SERVO_SPEEDS = {
+        0: None,
+        1: None,
+        2: None,
+        3: None,
+        4: None,
+        5: None,
+        6: None,
+        7: None
+    }
+    SERVO_ACCELERATIONS = {
+        0: None,
+        1: None,
+        2: None,
+        3: None,
+        4: None,
+        5: None,
+        6: None,
+        7: None
+    }
+    MAX_SPEED = 3968        # Largest speed the Maestro can store for a channel
+    MAX_ACCELERATION = 255  # Largest acceleration the Maestro accepts
+
+    # Motion Tracking
+    MOTION_POLL_INTERVAL = 0.25  # Seconds between moving-state polls while servos are in flight
+    MOTION_TIMEOUT = 30          # Seconds before an unfinished move is reported as timed out
+    MOTION_POLL_RETRIES = 3      # Failed polls in a row before in-flight moves are abandoned
+
     # Scene Storage
     SCENES_DIR = "scenes"
     MAX_SCENES = 8
@@ -5,19 +5,37 @@ Interfaces with Pololu Maestro via UscCmd.exe
 import subprocess
 import json
 import os
-from typing import Dict, List, Optional
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
 from config import Config
 
 class ServoController:
     def __init__(self):
         self.config = Config()
         self.config.ensure_scenes_dir()
+        # Limits known for each channel; unconfigured channels are filled in from --status
+        self.speeds = {servo_id: speed for servo_id, speed in self.config.SERVO_SPEEDS.items() if speed is not None}
+        self.accelerations = {servo_id: accel for servo_id, accel in self.config.SERVO_ACCELERATIONS.items() if accel is not None}
+        # Called as motion_listener(event, data) for motion_started/progress/complete.
+        # motion_started is sent while the moves lock is held, so the listener
+        # must not call back into the controller.
+        self.motion_listener = None
+        self._last_positions = {}  # Last positions read from the Maestro
+        self._moves = {}           # In-flight moves keyed by servo ID
+        self._completions = {}     # Last motion_complete event per servo ID
+        self._moves_lock = threading.Lock()
+        self._moves_changed = threading.Condition(self._moves_lock)
+        self._device_lock = threading.Lock()  # UscCmd can't share the Maestro, so calls take turns
+        self._poll_lock = threading.Lock()    # Avoids duplicate --status polls
+        self._last_poll = 0.0
     
     def _run_usc_cmd(self, args: List[str]) -> str:
         """Execute UscCmd.exe with given arguments"""
         try:
             cmd = [self.config.USC_CMD_PATH] + args
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
+            with self._device_lock:
+                result = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
             if result.returncode != 0:
                 raise Exception(f"UscCmd failed: {result.stderr}")
             return result.stdout
@@ -26,11 +44,11 @@ class ServoController:
         except subprocess.TimeoutExpired:
             raise Exception("UscCmd.exe timed out. Check Maestro connection.")
     
-    def get_servo_status(self) -> Dict[int, int]:
-        """Get current positions of all servos"""
+    def get_servo_states(self) -> Dict[int, dict]:
+        """Get target, speed, acceleration and current position of all servos"""
         try:
             output = self._run_usc_cmd(['--status'])
-            positions = {}
+            states = {}
             
             for line in output.split('\n'):
                 if line.strip():
@@ -38,14 +56,31 @@ class ServoController:
                     if len(parts) >= 5 and parts[0].isdigit():
                         servo_id = int(parts[0])
                         if servo_id < self.config.NUM_SERVOS:
-                            positions[servo_id] = int(parts[4])  # 'pos' column
+                            # Columns: '#', 'target', 'speed', 'accel', 'pos'
+                            states[servo_id] = {
+                                'target': int(parts[1]),
+                                'speed': int(parts[2]),
+                                'acceleration': int(parts[3]),
+                                'position': int(parts[4])
+                            }
+            
+            with self._moves_lock:
+                for servo_id, state in states.items():
+                    self._last_positions[servo_id] = state['position']
+                    self.speeds[servo_id] = state['speed']
+                    self.accelerations[servo_id] = state['acceleration']
             
-            return positions
+            return states
         except Exception as e:
             raise Exception(f"Failed to get servo status: {str(e)}")
     
-    def set_servo_position(self, servo_id: int, position: int) -> None:
-        """Set a specific servo to a specific position"""
+    def get_servo_status(self) -> Dict[int, int]:
+        """Get current positions of all servos"""
+        states = self.get_servo_states()
+        return {servo_id: state['position'] for servo_id, state in states.items()}
+    
+    def set_servo_position(self, servo_id: int, position: int) -> dict:
+        """Set a specific servo to a specific position, returns the tracked move"""
         if not 0 <= servo_id < self.config.NUM_SERVOS:
             raise ValueError(f"Servo ID must be between 0 and {self.config.NUM_SERVOS - 1}")
         
@@ -56,6 +91,218 @@ class ServoController:
             self._run_usc_cmd(['--servo', f'{servo_id},{position}'])
         except Exception as e:
             raise Exception(f"Failed to set servo {servo_id} to position {position}: {str(e)}")
+        
+        return self._track_move(servo_id, position)
+    
+    def set_servo_speed(self, servo_id: int, speed: int) -> None:
+        """Set the speed limit of a servo (0 = unlimited)"""
+        self._validate_motion_profile(servo_id, speed=speed)
+        
+        try:
+            self._run_usc_cmd(['--speed', f'{servo_id},{speed}'])
+        except Exception as e:
+            raise Exception(f"Failed to set servo {servo_id} speed to {speed}: {str(e)}")
+        
+        self.speeds[servo_id] = speed
+    
+    def set_servo_acceleration(self, servo_id: int, acceleration: int) -> None:
+        """Set the acceleration limit of a servo (0 = unlimited)"""
+        self._validate_motion_profile(servo_id, acceleration=acceleration)
+        
+        try:
+            self._run_usc_cmd(['--accel', f'{servo_id},{acceleration}'])
+        except Exception as e:
+            raise Exception(f"Failed to set servo {servo_id} acceleration to {acceleration}: {str(e)}")
+        
+        self.accelerations[servo_id] = acceleration
+    
+    def set_motion_profile(self, servo_id: int, speed: Optional[int] = None, acceleration: Optional[int] = None) -> None:
+        """Set speed and/or acceleration limits, validating both before sending either"""
+        self._validate_motion_profile(servo_id, speed=speed, acceleration=acceleration)
+        
+        if speed is not None:
+            self.set_servo_speed(servo_id, speed)
+        if acceleration is not None:
+            self.set_servo_acceleration(servo_id, acceleration)
+    
+    def _validate_motion_profile(self, servo_id: int, speed: Optional[int] = None, acceleration: Optional[int] = None) -> None:
+        """Raise ValueError for an out-of-range servo ID, speed or acceleration"""
+        if not 0 <= servo_id < self.config.NUM_SERVOS:
+            raise ValueError(f"Servo ID must be between 0 and {self.config.NUM_SERVOS - 1}")
+        if speed is not None and not 0 <= speed <= self.config.MAX_SPEED:
+            raise ValueError(f"Speed must be between 0 and {self.config.MAX_SPEED}")
+        if acceleration is not None and not 0 <= acceleration <= self.config.MAX_ACCELERATION:
+            raise ValueError(f"Acceleration must be between 0 and {self.config.MAX_ACCELERATION}")
+    
+    def apply_motion_profiles(self) -> None:
+        """Send the configured speed and acceleration limits to the Maestro"""
+        # Limits set over USB are lost when the Maestro resets, so configured
+        # channels are re-applied on startup. Channels left as None keep the
+        # limits saved on the device and are read back from --status instead.
+        for servo_id, speed in self.config.SERVO_SPEEDS.items():
+            if speed is not None:
+                self.set_servo_speed(servo_id, speed)
+        for servo_id, acceleration in self.config.SERVO_ACCELERATIONS.items():
+            if acceleration is not None:
+                self.set_servo_acceleration(servo_id, acceleration)
+        
+        self.get_servo_states()
+    
+    def _track_move(self, servo_id: int, target: int) -> dict:
+        """Record a move as in flight until the Maestro reports it has arrived"""
+        with self._moves_lock:
+            move = {
+                'servo_id': servo_id,
+                'start_position': self._last_positions.get(servo_id),
+                'target': target,
+                'speed': self.speeds.get(servo_id),
+                'acceleration': self.accelerations.get(servo_id),
+                'started_at': time.monotonic()
+            }
+            # A new command supersedes any move still in flight on this channel
+            self._moves[servo_id] = move
+            
+            # Announced under the lock so no poll can complete the move first
+            self._notify('motion_started', {
+                key: value for key, value in move.items() if key != 'started_at'
+            })
+            return dict(move)
+    
+    def _notify(self, event: str, data: dict) -> None:
+        """Pass a motion event to the listener, if one is registered"""
+        if self.motion_listener:
+            self.motion_listener(event, data)
+    
+    def get_moves(self, servo_ids: Optional[List[int]] = None) -> Dict[int, dict]:
+        """Get in-flight moves, optionally limited to the given servos"""
+        with self._moves_lock:
+            return {
+                servo_id: dict(move) for servo_id, move in self._moves.items()
+                if servo_ids is None or servo_id in servo_ids
+            }
+    
+    def is_moving(self, servo_ids: Optional[List[int]] = None) -> bool:
+        """Check whether any (or any of the given) servos have a move in flight"""
+        return bool(self.get_moves(servo_ids))
+    
+    def poll_motion(self) -> Tuple[List[dict], List[dict]]:
+        """Check in-flight moves against the Maestro, returns (progress, completed) events"""
+        with self._poll_lock:
+            if not self.is_moving():
+                return [], []
+            
+            # Moves commanded after this point may not be reflected in the snapshot
+            polled_at = time.monotonic()
+            self._last_poll = polled_at
+            states = self.get_servo_states()
+            now = time.monotonic()
+            progress_events = []
+            completed_events = []
+            
+            with self._moves_lock:
+                for servo_id, move in list(self._moves.items()):
+                    if move['started_at'] >= polled_at:
+                        continue
+                    
+                    state = states.get(servo_id)
+                    position = state['position'] if state else self._last_positions.get(servo_id)
+                    event = {
+                        'servo_id': servo_id,
+                        'position': position,
+                        'target': move['target'],
+                        'progress': self._move_progress(move, position)
+                    }
+                    
+                    if state is not None and position == move['target']:
+                        event.update(timed_out=False, superseded=False)
+                        completed_events.append(event)
+                    elif state is not None and state['target'] != move['target']:
+                        # The snapshot is newer than the move, so something else
+                        # (a Maestro script or another UscCmd call) retargeted it
+                        event.update(timed_out=False, superseded=True)
+                        completed_events.append(event)
+                    elif now - move['started_at'] > self.config.MOTION_TIMEOUT:
+                        event.update(timed_out=True, superseded=False)
+                        completed_events.append(event)
+                    elif state is not None:
+                        progress_events.append(event)
+                
+                for event in completed_events:
+                    self._finish_move(event)
+            
+            for event in progress_events:
+                self._notify('motion_progress', event)
+            for event in completed_events:
+                self._notify('motion_complete', event)
+            
+            return progress_events, completed_events
+    
+    def fail_moves(self, error: str) -> List[dict]:
+        """Give up on every in-flight move, returns the timed-out completion events"""
+        with self._poll_lock:
+            with self._moves_lock:
+                completed_events = []
+                for servo_id, move in list(self._moves.items()):
+                    position = self._last_positions.get(servo_id)
+                    event = {
+                        'servo_id': servo_id,
+                        'position': position,
+                        'target': move['target'],
+                        'progress': self._move_progress(move, position),
+                        'timed_out': True,
+                        'superseded': False,
+                        'error': error
+                    }
+                    completed_events.append(event)
+                    self._finish_move(event)
+            
+            for event in completed_events:
+                self._notify('motion_complete', event)
+            
+            return completed_events
+    
+    def _finish_move(self, event: dict) -> None:
+        """Stop tracking a move and wake anything waiting on it (moves lock must be held)"""
+        del self._moves[event['servo_id']]
+        self._completions[event['servo_id']] = event
+        self._moves_changed.notify_all()
+    
+    def wait_for_motion(self, servo_ids: Optional[List[int]] = None, timeout: Optional[float] = None) -> List[dict]:
+        """Block until the given servos (default: all moving) finish, returns their completion events
+        
+        Waiters are woken by whoever polls, normally the web server's motion
+        monitor. If nothing has polled recently the waiter polls itself. A
+        servo that already finished returns its last completion event.
+        """
+        interval = self.config.MOTION_POLL_INTERVAL
+        if timeout is None:
+            # Outlast the per-move timeout so a stuck move reports timed_out first
+            timeout = self.config.MOTION_TIMEOUT + 2 * interval
+        deadline = time.monotonic() + timeout
+        waiting_for = set(servo_ids) if servo_ids is not None else set(self.get_moves())
+        
+        while True:
+            with self._moves_lock:
+                if not any(servo_id in self._moves for servo_id in waiting_for):
+                    return [self._completions[servo_id] for servo_id in sorted(waiting_for)
+                            if servo_id in self._completions]
+                
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("Timed out waiting for servos to finish moving")
+                self._moves_changed.wait(min(remaining, interval))
+            
+            if time.monotonic() - self._last_poll > interval * 2:
+                self.poll_motion()
+    
+    @staticmethod
+    def _move_progress(move: dict, position: Optional[int]) -> Optional[float]:
+        """Percentage of a move completed, or None if the start position is unknown"""
+        start = move['start_position']
+        if start is None or position is None or start == move['target']:
+            return None
+        progress = ((position - start) / (move['target'] - start)) * 100
+        return max(0, min(100, round(progress, 1)))
     
     def nudge_servo(self, servo_id: int, direction: str) -> int:
         """Nudge servo in given direction, returns new position"""
@@ -57,6 +57,22 @@ class HALController {
             }
         });
 
+        this.socket.on('motion_progress', (data) => {
+            this.updateServoDisplay(data.servo_id, data.position);
+        });
+
+        this.socket.on('motion_complete', (data) => {
+            this.updateServoDisplay(data.servo_id, data.position);
+            if (data.timed_out) {
+                this.log(`Servo ${data.servo_id} did not reach ${data.target} (stopped at ${data.position})`, 'error');
+            }
+        });
+
+        this.socket.on('motion_profile_update', (data) => {
+            if (this.config.servo_speeds) this.config.servo_speeds[data.servo_id] = data.speed;
+            if (this.config.servo_accelerations) this.config.servo_accelerations[data.servo_id] = data.acceleration;
+        });
+
         this.socket.on('error', (data) => {
             this.log(`Error: ${data.message}`, 'error');
         });
@@ -20,6 +20,223 @@ def test_config():
     assert config.MAX_POSITION == 7232
     print("[OK] Configuration test passed")
 
+def test_motion_profiles():
+    """Test that configured speed and acceleration limits are in range"""
+    print("Testing motion profiles...")
+    for servo_id in range(Config.NUM_SERVOS):
+        speed = Config.SERVO_SPEEDS.get(servo_id)
+        accel = Config.SERVO_ACCELERATIONS.get(servo_id)
+        assert speed is None or 0 <= speed <= Config.MAX_SPEED
+        assert accel is None or 0 <= accel <= Config.MAX_ACCELERATION
+    print("[OK] Motion profile test passed")
+
+class FakeMaestro:
+    """Stands in for UscCmd.exe, answering --status from canned servo states"""
+    def __init__(self, position=4000):
+        self.states = {i: {'target': position, 'speed': 0, 'accel': 0, 'pos': position}
+                       for i in range(Config.NUM_SERVOS)}
+        self.commands = []
+        self.on_status = None  # Called after the --status snapshot is taken
+
+    def run(self, args):
+        self.commands.append(args)
+        if args[0] == '--status':
+            output = "#  target   speed   accel     pos\n" + "\n".join(
+                f"{i} {s['target']} {s['speed']} {s['accel']} {s['pos']}" for i, s in self.states.items())
+            if self.on_status:
+                self.on_status()
+            return output
+        servo_id, value = (int(v) for v in args[1].split(','))
+        column = {'--servo': 'target', '--speed': 'speed', '--accel': 'accel'}[args[0]]
+        self.states[servo_id][column] = value
+        return ''
+
+def make_fake_controller():
+    """Create a controller wired to a FakeMaestro, with motion events recorded"""
+    controller = ServoController()
+    maestro = FakeMaestro()
+    controller._run_usc_cmd = maestro.run
+    controller.config.MOTION_POLL_INTERVAL = 0.01
+    events = []
+    controller.motion_listener = lambda event, data: events.append((event, data))
+    controller.get_servo_states()
+    return controller, maestro, events
+
+def test_motion_completion():
+    """Test that a move is reported in progress and then complete"""
+    print("Testing motion completion...")
+    controller, maestro, events = make_fake_controller()
+
+    move = controller.set_servo_position(2, 5000)
+    assert move['start_position'] == 4000 and move['target'] == 5000
+    assert events[0][0] == 'motion_started'
+
+    maestro.states[2]['pos'] = 4500
+    progress, completed = controller.poll_motion()
+    assert progress == [{'servo_id': 2, 'position': 4500, 'target': 5000, 'progress': 50.0}]
+    assert completed == []
+
+    maestro.states[2]['pos'] = 5000
+    progress, completed = controller.poll_motion()
+    assert progress == []
+    assert completed[0]['servo_id'] == 2 and completed[0]['timed_out'] is False
+    assert not controller.is_moving()
+    assert [event for event, _ in events] == ['motion_started', 'motion_progress', 'motion_complete']
+    print("[OK] Motion completion test passed")
+
+def test_motion_timeout():
+    """Test that moves which never arrive, or vanish from --status, time out"""
+    print("Testing motion timeout...")
+    controller, maestro, events = make_fake_controller()
+    controller.config.MOTION_TIMEOUT = 0
+
+    controller.set_servo_position(1, 6000)
+    _, completed = controller.poll_motion()
+    assert completed[0]['timed_out'] is True
+    assert not controller.is_moving()
+
+    # A channel missing from the status output must still time out
+    controller.set_servo_position(3, 6000)
+    del maestro.states[3]
+    _, completed = controller.poll_motion()
+    assert completed[0]['servo_id'] == 3 and completed[0]['timed_out'] is True
+    assert not controller.is_moving()
+
+    # Moves abandoned after failed polls are still reported complete
+    controller.set_servo_position(1, 2000)
+    completed = controller.fail_moves("UscCmd.exe timed out")
+    assert completed[0]['timed_out'] is True and completed[0]['error'] == "UscCmd.exe timed out"
+    assert events[-1][0] == 'motion_complete'
+    print("[OK] Motion timeout test passed")
+
+def test_superseded_move():
+    """Test that a new command replaces a move still in flight"""
+    print("Testing superseded move...")
+    controller, maestro, events = make_fake_controller()
+
+    controller.set_servo_position(0, 5000)
+    maestro.states[0]['pos'] = 4500
+    controller.poll_motion()
+    controller.set_servo_position(0, 3000)
+
+    # Passing the old target must not complete the new move
+    maestro.states[0]['pos'] = 5000
+    progress, completed = controller.poll_motion()
+    assert completed == [] and progress[0]['target'] == 3000
+    assert controller.get_moves()[0]['start_position'] == 4500
+
+    maestro.states[0]['pos'] = 3000
+    _, completed = controller.poll_motion()
+    assert completed[0]['target'] == 3000 and completed[0]['timed_out'] is False
+    assert completed[0]['superseded'] is False
+
+    # Retargeted outside the controller (e.g. a Maestro script): ends as superseded
+    controller.set_servo_position(0, 6000)
+    maestro.states[0]['target'] = 2500
+    _, completed = controller.poll_motion()
+    assert completed[0]['superseded'] is True and completed[0]['timed_out'] is False
+    assert not controller.is_moving()
+    print("[OK] Superseded move test passed")
+
+def test_stale_status_snapshot():
+    """Test that a --status snapshot taken before a command can't complete its move"""
+    print("Testing stale status snapshot...")
+    controller, maestro, events = make_fake_controller()
+    controller.set_servo_position(0, 5000)  # Keeps the poll from returning early
+
+    # Servo 1 is commanded while the poll's --status is in flight
+    def command_during_poll():
+        maestro.on_status = None
+        controller.set_servo_position(1, 6000)
+    maestro.on_status = command_during_poll
+
+    progress, completed = controller.poll_motion()
+    assert all(event['servo_id'] != 1 for event in progress + completed)
+    assert controller.is_moving([1])
+    print("[OK] Stale status snapshot test passed")
+
+def test_move_progress():
+    """Test progress percentage clamping and unknown start positions"""
+    print("Testing move progress...")
+    move = {'start_position': 4000, 'target': 5000}
+    assert ServoController._move_progress(move, 4250) == 25.0
+    assert ServoController._move_progress(move, 3000) == 0
+    assert ServoController._move_progress(move, 6000) == 100
+    assert ServoController._move_progress({'start_position': None, 'target': 5000}, 4500) is None
+    assert ServoController._move_progress(move, None) is None
+    print("[OK] Move progress test passed")
+
+def test_wait_for_motion():
+    """Test waiting for completion, both polling alone and woken by another poller"""
+    print("Testing wait for motion...")
+    import threading
+    import time
+    controller, maestro, events = make_fake_controller()
+
+    # Nothing else polling: the waiter polls itself
+    controller.set_servo_position(4, 5000)
+    maestro.states[4]['pos'] = 5000
+    completed = controller.wait_for_motion([4], timeout=1)
+    assert completed[0]['servo_id'] == 4 and completed[0]['timed_out'] is False
+
+    # A monitor thread polling wakes the waiter
+    controller.set_servo_position(5, 5000)
+    results = []
+    waiter = threading.Thread(target=lambda: results.extend(controller.wait_for_motion([5], timeout=2)))
+    waiter.start()
+    while not controller._moves_changed._waiters:  # Wait until the waiter is blocked
+        time.sleep(0.001)
+    maestro.states[5]['pos'] = 5000
+    controller.poll_motion()
+    waiter.join(timeout=2)
+    assert results and results[0]['servo_id'] == 5
+
+    # A waiter arriving after the move finished still gets its completion
+    completed = controller.wait_for_motion([5], timeout=0.05)
+    assert completed[0]['servo_id'] == 5 and completed[0]['timed_out'] is False
+
+    controller.set_servo_position(6, 5000)
+    try:
+        controller.wait_for_motion([6], timeout=0.05)
+        assert False, "Expected TimeoutError"
+    except TimeoutError:
+        pass
+    print("[OK] Wait for motion test passed")
+
+def test_motion_profile_validation():
+    """Test speed/acceleration validation and that limits are only sent when valid"""
+    print("Testing motion profile validation...")
+    controller, maestro, events = make_fake_controller()
+
+    controller.set_servo_speed(0, 40)
+    controller.set_servo_acceleration(0, 10)
+    assert controller.speeds[0] == 40 and controller.accelerations[0] == 10
+
+    for call in (lambda: controller.set_servo_speed(0, -1),
+                 lambda: controller.set_servo_speed(0, Config.MAX_SPEED + 1),
+                 lambda: controller.set_servo_acceleration(0, Config.MAX_ACCELERATION + 1),
+                 lambda: controller.set_servo_speed(Config.NUM_SERVOS, 10)):
+        try:
+            call()
+            assert False, "Expected ValueError"
+        except ValueError:
+            pass
+
+    # A bad acceleration must stop the speed from being sent too
+    sent = len(maestro.commands)
+    try:
+        controller.set_motion_profile(0, speed=100, acceleration=999)
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+    assert len(maestro.commands) == sent and controller.speeds[0] == 40
+
+    # Unconfigured channels pick up the limits saved on the device
+    maestro.states[7]['speed'] = 25
+    controller.get_servo_states()
+    assert controller.speeds[7] == 25
+    print("[OK] Motion profile validation test passed")
+
 def test_servo_controller_init():
     """Test servo controller initialization"""
     print("Testing servo controller initialization...")
@@ -65,6 +282,16 @@ def run_basic_tests():
     test_config()
     print()
     
+    test_motion_profiles()
+    test_motion_completion()
+    test_motion_timeout()
+    test_superseded_move()
+    test_stale_status_snapshot()
+    test_move_progress()
+    test_wait_for_motion()
+    test_motion_profile_validation()
+    print()
+    
     # Test servo controller
     controller = test_servo_controller_init()
     print()